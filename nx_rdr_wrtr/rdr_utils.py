@@ -1,11 +1,15 @@
 "Utilities to create readers."
+import functools
+import itertools
+import keyword
+import unicodedata
 
 
 # Class is abstract
 class BaseLine:     # pylint: disable=no-member,too-few-public-methods
     "Base line object to include line number in repr call."
     def __repr__(self):
-        return 'Line: {} {}'.format(self.line_num, super().__repr__())
+        return f'Line: {self.line_num} {super().__repr__()}'
 
 
 # Class is abstract
@@ -25,55 +29,74 @@ class ImmutableLine(BaseLine):    # pylint: disable=too-few-public-methods
         return obj
 
 
+# internal class
+class _DictLine(MutableLine, dict):  # pylint: disable=too-few-public-methods
+    "Dictionary line."
+    def __repr__(self):
+        return f'Line: {self.line_num} {dict.__repr__(self)}'
+
+
+def _lstrip(lst, _map=map, _lstrip=str.lstrip):
+    """Left-strip every element of the list, in-place."""
+    lst[:] = _map(_lstrip, lst)
+    return lst
+
+
+def _rstrip(lst, _map=map, _rstrip=str.rstrip):
+    """Right-strip every element of the list, in-place."""
+    lst[:] = _map(_rstrip, lst)
+    return lst
+
+
+def _strip(lst, _map=map, _strip=str.strip):
+    """Strip every element of the list, in-place."""
+    lst[:] = _map(_strip, lst)
+    return lst
+
+
 def list_reader(rdr, *, leading_ws=True, trailing_ws=True, ignore_blanks=True,
                 ignore=None, handler=None):
     """
     Attach the common wrappers to the base list generator <rdr> to produce a
     list reader generator.
     """
-    def lstrip(lst):
-        """Left-strip every element of the list, in-place."""
-        for idx, elem in enumerate(lst):
-            lst[idx] = elem.lstrip()
-        return lst
-
-    def rstrip(lst):
-        """Right-strip every element of the list, in-place."""
-        for idx, elem in enumerate(lst):
-            lst[idx] = elem.rstrip()
-        return lst
-
-    def strip(lst):
-        """Strip every element of the list, in-place."""
-        for idx, elem in enumerate(lst):
-            lst[idx] = elem.strip()
-        return lst
-
     if not leading_ws and not trailing_ws:
-        # wrap the reader to left/right-strip each element in each list
-        rdr = map(strip, rdr)           # pylint: disable=bad-builtin
+        # left/right-strip each element in each list
+        strip_lst = _strip
     elif not trailing_ws:
-        # wrap the reader to right-strip each element in each list
-        rdr = map(rstrip, rdr)          # pylint: disable=bad-builtin
+        # right-strip each element in each list
+        strip_lst = _rstrip
     elif not leading_ws:
-        # wrap the reader to left-strip each element in each list
-        rdr = map(lstrip, rdr)          # pylint: disable=bad-builtin
-
-    if ignore_blanks:
-        # wrap the reader to skip lists that are empty or all blank
-        rdr = filter(any, rdr) # pylint: disable=bad-builtin,redefined-variable-type
-
-    if ignore is not None:
-        # wrap the reader to skip lists that are equal to <ignore>
-        rdr = (x for x in rdr if x != ignore)
+        # left-strip each element in each list
+        strip_lst = _lstrip
+    else:
+        strip_lst = None
 
-    if handler:
-        # wrap the reader to process each list through the handler, skipping
-        # those that the handler rejects - signified by the handler returning
-        # None
-        rdr = (x for x in map(handler, rdr) if x is not None) # pylint: disable=bad-builtin
+    if strip_lst is None and not ignore_blanks and ignore is None and \
+       not handler:
+        return rdr
 
-    return rdr
+    def _(rdr, _any=any):
+        # a single generator applies every enabled option, in order, so that
+        # each list only pays for one generator resume
+        for lst in rdr:
+            if strip_lst is not None:
+                strip_lst(lst)
+            if ignore_blanks and not _any(lst):
+                # skip lists that are empty or all blank
+                continue
+            if ignore is not None and lst == ignore:
+                # skip lists that are equal to <ignore>
+                continue
+            if handler:
+                # process each list through the handler, skipping those that
+                # the handler rejects - signified by the handler returning
+                # None
+                lst = handler(lst)
+                if lst is None:
+                    continue
+            yield lst
+    return _(rdr)
 
 
 # internal function
@@ -82,15 +105,17 @@ def _get_fields(rdr, fields, handler, leading_ws, trailing_ws, ignore_blanks,
                 ignore_rows_with_fields, field_rename):
     """
     Process the map reader arguments, wrapping the reader as needed, and
-    return the reader and the fields.
+    return the reader and the fields tuple.
     """
     if fields is not None and field_rename is not None:
         raise ValueError('rename specified with supplied fields')
     if fields is None:
-        tmp_rdr = list_reader(rdr, leading_ws=leading_ws,
-                              trailing_ws=trailing_ws,
-                              ignore_blanks=ignore_blanks, handler=handler)
-        fields = next(tmp_rdr)
+        # only the header is read through this reader - it is a single fused
+        # generator so nothing is stacked on the data reader
+        fields = next(list_reader(rdr, leading_ws=leading_ws,
+                                  trailing_ws=trailing_ws,
+                                  ignore_blanks=ignore_blanks,
+                                  handler=handler))
     else:
         fields = [getattr(col, 'name', col) for col in fields]
     if not fields:
@@ -98,17 +123,35 @@ def _get_fields(rdr, fields, handler, leading_ws, trailing_ws, ignore_blanks,
     ignore = fields if ignore_rows_with_fields else None
     if field_rename:
         fields = [field_rename.get(x, x) for x in fields]
-    if len(fields) != len(set(fields)):
-        raise ValueError('duplicate field names', fields)
     rdr = list_reader(rdr, leading_ws=leading_ws, trailing_ws=trailing_ws,
                       ignore_blanks=ignore_blanks, ignore=ignore,
                       handler=handler)
-    return rdr, fields
+    return rdr, tuple(fields)
+
+
+# internal function
+@functools.lru_cache(maxsize=128)
+def _validate_fields(fields, attrs):
+    """
+    Validate the <fields> tuple, additionally requiring valid attribute names
+    if <attrs> is set. Valid field tuples are cached as readers of files with
+    identical headers are commonly created repeatedly.
+    """
+    if len(fields) != len(set(fields)):
+        raise ValueError('duplicate field names', list(fields))
+    if attrs:
+        for field in fields:
+            if not field or not field.isidentifier() or field == 'line_num':
+                raise ValueError('invalid field name', field)
+    elif not all(fields):
+        raise ValueError('blank field name', list(fields))
 
 
 def _map_reader_gen(rdr, fields, rest_key, rest_val):
     "Generator for a map reader."
     fields_length = len(fields)
+    # single-entry cache of the extended fields for the last over-long line
+    extra_length, extra_fields = None, None
     for line in rdr:
         line_length = len(line)
         if line_length == fields_length:
@@ -117,56 +160,107 @@ def _map_reader_gen(rdr, fields, rest_key, rest_val):
             if rest_key is None:
                 raise ValueError('too many fields', line.line_num,
                                  fields_length, line_length)
-            active_fields = fields + \
-                            [rest_key + str(x)
-                             for x in range(line_length - fields_length)]
-            if len(active_fields) != len(set(active_fields)):
-                raise ValueError('rest_key generated duplicate key',
-                                 line.line_num, active_fields)
+            if line_length != extra_length:
+                active_fields = fields + \
+                                tuple([rest_key + str(x)
+                                       for x in range(line_length -
+                                                      fields_length)])
+                if len(active_fields) != len(set(active_fields)):
+                    raise ValueError('rest_key generated duplicate key',
+                                     line.line_num, active_fields)
+                extra_length, extra_fields = line_length, active_fields
+            else:
+                active_fields = extra_fields
         elif rest_val is not None:
             active_fields = fields
-            line += [rest_val] * (fields_length - line_length)
+            line.extend(itertools.repeat(rest_val,
+                                         fields_length - line_length))
         else:
             raise ValueError('insufficient fields', line.line_num,
                              fields_length, line_length)
         yield active_fields, line
 
 
+@functools.lru_cache(maxsize=128)
+def _fields_setter(fields):
+    """
+    Return a function that sets each of the <fields> on an object from the
+    corresponding element of a line. The functions are cached by fields tuple
+    as they are compiled.
+    """
+    lines = ['def set_fields(obj, line):\n']
+    for idx, field in enumerate(fields):
+        if keyword.iskeyword(field) or field == '__debug__' or \
+           unicodedata.normalize('NFKC', field) != field:
+            # keywords and __debug__ cannot be assigned in source and the
+            # compiler NFKC-normalizes identifiers, so these are set by name
+            stmt = '    setattr(obj, {!r}, line[{}])\n'.format(field, idx)
+        else:
+            stmt = '    obj.{} = line[{}]\n'.format(field, idx)
+        lines.append(stmt)
+    namespace = {}
+    exec(''.join(lines), namespace)     # pylint: disable=exec-used
+    return namespace['set_fields']
+
+
+def _obj_reader_gen(rdr, ctor, fields, rest_key, rest_val):
+    "Generator for an object reader, returning the line number and object."
+    set_fields = _fields_setter(fields)
+    fields_length = len(fields)
+    for active_fields, line in _map_reader_gen(rdr, fields, rest_key,
+                                               rest_val):
+        result = ctor()
+        set_fields(result, line)
+        if active_fields is not fields:
+            # set the rest_key generated fields
+            for key, val in zip(active_fields[fields_length:],
+                                line[fields_length:]):
+                setattr(result, key, val)
+        yield line.line_num, result
+
+
 def dict_reader(rdr, *, fields=None, handler=None, leading_ws=True,
                 trailing_ws=False, ignore_blanks=True, rest_key=None,
                 rest_val=None, ignore_rows_with_fields=True,
-                field_rename=None):
-    "Return a generator that processes a list reader and returns a dictionary."
+                field_rename=None, with_line_num=True):
+    """
+    Return a generator that processes a list reader and returns a dictionary.
+    If <with_line_num> is false, a tuple of the line number and a plain
+    dictionary is returned instead.
+    """
     rdr, fields = _get_fields(rdr, fields, handler, leading_ws, trailing_ws,
                               ignore_blanks, ignore_rows_with_fields,
                               field_rename)
-    if not all(fields):
-        raise ValueError('blank field name', fields)
+    _validate_fields(fields, False)
     def _(rdr, fields):
-        class Line(MutableLine, dict):
-            "Dictionary line."
-            pass
         for fields, line in _map_reader_gen(rdr, fields, rest_key, rest_val):
-            result = Line({k: v for k, v in zip(fields, line)}, line.line_num)
-            yield result
+            yield _DictLine(zip(fields, line), line.line_num)
+    def _plain(rdr, fields):
+        for fields, line in _map_reader_gen(rdr, fields, rest_key, rest_val):
+            yield line.line_num, dict(zip(fields, line))
+    if not with_line_num:
+        return _plain(rdr, fields)
     return _(rdr, fields)
 
 
 def obj_reader(rdr, ctor, *, fields=None, handler=None, leading_ws=True,
                trailing_ws=False, ignore_blanks=True, rest_key=None,
-               rest_val=None, ignore_rows_with_fields=True, field_rename=None):
-    "Return a generator that process a list reader and returns an object."
+               rest_val=None, ignore_rows_with_fields=True, field_rename=None,
+               with_line_num=True):
+    """
+    Return a generator that process a list reader and returns an object. If
+    <with_line_num> is false, the line number is not set on the object and a
+    tuple of the line number and the object is returned instead.
+    """
     rdr, fields = _get_fields(rdr, fields, handler, leading_ws, trailing_ws,
                               ignore_blanks, ignore_rows_with_fields,
                               field_rename)
-    for field in fields:
-        if not field or not field.isidentifier() or field == 'line_num':
-            raise ValueError('invalid field name', field)
+    _validate_fields(fields, True)
     def _(rdr, ctor, fields):
-        for fields, line in _map_reader_gen(rdr, fields, rest_key, rest_val):
-            result = ctor()
-            for key, val in zip(fields, line):
-                setattr(result, key, val)
-            result.line_num = line.line_num
+        for line_num, result in _obj_reader_gen(rdr, ctor, fields, rest_key,
+                                                rest_val):
+            result.line_num = line_num
             yield result
+    if not with_line_num:
+        return _obj_reader_gen(rdr, ctor, fields, rest_key, rest_val)
     return _(rdr, ctor, fields)
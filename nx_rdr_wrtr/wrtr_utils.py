@@ -1,8 +1,13 @@
 "Utilities to create writers."
-import csv
+import pickle
+import tempfile
 import nx_misc
 
 
+# size at which a minimize spool is moved from memory to disk
+_SPOOL_MAX_SIZE = 1 << 20
+
+
 # Do not consider context methods private
 class HeaderlessMixin:        # pylint: disable=too-few-public-methods
     "Mixin for writers that do not support headers."
@@ -29,8 +34,9 @@ class HeaderlessMixin:        # pylint: disable=too-few-public-methods
 class HeaderMixin:
     "Mixin for writers that support headers."
     _wrtr = None
-    _fobj = None
-    _fields_used = None
+    _spool = None
+    _fields_used_mask = 0
+    _fields_all_mask = 0
     _closed = True
 
     def __enter__(self):
@@ -46,23 +52,31 @@ class HeaderMixin:
             self._wrtr, wrtr = None, self._wrtr
             try:
                 if self.minimize:
-                    self._fobj, fobj = None, self._fobj
+                    self._spool, spool = None, self._spool
                     try:
-                        fobj.seek(0)
-                        fields = [x for x in self.fields
-                                  if x in self._fields_used]
-                        if not fields:
+                        spool.seek(0)
+                        mask = self._fields_used_mask
+                        keep = [idx for idx in range(len(self.fields))
+                                if mask & (1 << idx)]
+                        if len(keep) in (0, len(self.fields)):
+                            # every field is written
+                            keep = None
                             fields = self.fields
+                        else:
+                            fields = [self.fields[idx] for idx in keep]
                         write = wrtr.write
                         write(fields)
-                        for data in csv.DictReader(fobj, delimiter='|'):
-                            data = nx_misc.flatten_dict(data, fields,
-                                                        rest_val=None,
-                                                        extras_action='ignore',
-                                                        field_set=None)
+                        load = pickle.load
+                        while True:
+                            try:
+                                data = load(spool)
+                            except EOFError:
+                                break
+                            if keep is not None:
+                                data = [data[idx] for idx in keep]
                             write(data)
                     finally:
-                        fobj.close()
+                        spool.close()
             finally:
                 wrtr.close()
 
@@ -84,18 +98,32 @@ class HeaderMixin:
         else:
             data = lst
         if self.minimize:
-            self._fields_used.update({k for k, v in zip(self.fields, data)
-                                      if v is not None and str(v).strip()})
-            self._csv_wrtr.writerow(data)
+            # bit <idx> of the mask is set once field <idx> has been used
+            mask = self._fields_used_mask
+            if mask != self._fields_all_mask:
+                bit = 1
+                for val in data:
+                    if not mask & bit and val is not None:
+                        if isinstance(val, str):
+                            if val and not val.isspace():
+                                mask |= bit
+                        elif str(val).strip():
+                            mask |= bit
+                    bit <<= 1
+                self._fields_used_mask = mask
+            # spool the data as it would have been read back from a csv file
+            pickle.dump(['' if x is None else str(x) for x in data],
+                        self._spool, pickle.HIGHEST_PROTOCOL)
         else:
             self._wrtr.write(data)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if self.minimize:
-            self._csv_wrtr = csv.writer(self._fobj, delimiter='|',
-                                        lineterminator='\n')
-            self._csv_wrtr.writerow(self.fields)
+            self._fields_used_mask = 0
+            self._fields_all_mask = (1 << len(self.fields)) - 1
+            # the data is spooled pickled, in memory until it grows large
+            self._spool = tempfile.SpooledTemporaryFile(_SPOOL_MAX_SIZE)
 
 
 # Mixin needed to abrstract writes